@@ -1,9 +1,63 @@
 """Instance selector component."""
 
-from typing import Dict, Set
+from typing import Dict, Iterable, Set
 
+import pandas as pd
 import streamlit as st
 
+from app.config import INSTANCE_PAGE_SIZE, INSTANCE_PAGE_SIZE_OPTIONS
+
+
+def _clear_editor_state():
+    """Drop pending edits of every instance table page."""
+    for key in [k for k in st.session_state.keys() if k.startswith('instance_editor_')]:
+        del st.session_state[key]
+
+
+def reset_instance_selector_state():
+    """Reset table edits and pagination, e.g. when the frame changes."""
+    _clear_editor_state()
+    st.session_state.pop('instance_page', None)
+
+
+def set_selection(ids: Iterable[int]):
+    """Update the instance selection in session state.
+
+    Also stores the selection as a sorted tuple of strings, the form
+    PatchingService expects, so it is not rebuilt on every Patch click.
+
+    Args:
+        ids: Selected instance IDs
+    """
+    ids = set(ids)
+    st.session_state['selected_instances'] = ids
+    st.session_state['selected_instances_str'] = tuple(sorted(map(str, ids)))
+
+
+def _sorted_instances_frame(instances: Dict[int, int]) -> pd.DataFrame:
+    """Instances sorted by point count, re-sorted only when instances change.
+
+    The instances dict is shared between reruns by the frame cache, so its
+    identity tells whether the sorted table is still valid.
+
+    Args:
+        instances: Dict mapping instance_id to point_count
+
+    Returns:
+        DataFrame with 'id' and 'points' columns, sorted by point count desc
+    """
+    cached = st.session_state.get('sorted_instances')
+    if cached is not None and cached[0] is instances:
+        return cached[1]
+
+    ids = sorted(instances.keys())
+    df = pd.DataFrame({
+        'id': ids,
+        'points': [instances[instance_id] for instance_id in ids],
+    }).sort_values('points', ascending=False, kind='stable')  # Sort by point count desc
+    st.session_state['sorted_instances'] = (instances, df)
+    return df
+
 
 def render_instance_selector(instances: Dict[int, int],
                              selected_instances: Set[int]) -> Set[int]:
@@ -26,32 +80,59 @@ def render_instance_selector(instances: Dict[int, int],
     col1, col2, col3 = st.columns([1, 1, 4])
     with col1:
         if st.button("Select All", use_container_width=True):
+            # Drop pending table edits so the new selection is shown as is
+            _clear_editor_state()
             return set(instances.keys())
     with col2:
         if st.button("Clear All", use_container_width=True):
+            _clear_editor_state()
             return set()
     with col3:
         st.caption(f"{len(instances)} instances available, {len(selected_instances)} selected")
 
-    # Instance checkboxes in a grid
-    new_selection = set()
-    num_cols = 4
-    cols = st.columns(num_cols)
-
-    sorted_instances = sorted(instances.items(), key=lambda x: -x[1])  # Sort by point count desc
-
-    for idx, (instance_id, point_count) in enumerate(sorted_instances):
-        col = cols[idx % num_cols]
-        with col:
-            checked = st.checkbox(
-                f"ID {instance_id} ({point_count:,} pts)",
-                value=instance_id in selected_instances,
-                key=f"instance_checkbox_{instance_id}"
+    # Single editable table instead of a checkbox per instance
+    df = _sorted_instances_frame(instances)
+
+    # Paginate so only one page of rows is sent to the browser
+    page_size = INSTANCE_PAGE_SIZE
+    page = 1
+    if len(df) > min(INSTANCE_PAGE_SIZE_OPTIONS):
+        col1, col2, col3 = st.columns([1, 1, 4])
+        with col1:
+            page_size = st.selectbox(
+                "Rows per page",
+                options=INSTANCE_PAGE_SIZE_OPTIONS,
+                index=INSTANCE_PAGE_SIZE_OPTIONS.index(INSTANCE_PAGE_SIZE),
+                key='instance_page_size'
             )
-            if checked:
-                new_selection.add(instance_id)
-
-    return new_selection
+        num_pages = (len(df) + page_size - 1) // page_size
+        if st.session_state.get('instance_page', 1) > num_pages:
+            st.session_state.pop('instance_page')
+        with col2:
+            page = st.number_input("Page", min_value=1, max_value=num_pages, step=1, key='instance_page')
+        with col3:
+            st.caption(f"Page {page} of {num_pages}")
+
+    page_df = df.iloc[(page - 1) * page_size:page * page_size].copy()
+    page_df['selected'] = page_df['id'].isin(selected_instances)
+
+    edited = st.data_editor(
+        page_df,
+        hide_index=True,
+        use_container_width=True,
+        disabled=['id', 'points'],
+        column_config={
+            'id': st.column_config.NumberColumn("ID", format="%d"),
+            'points': st.column_config.NumberColumn("Points", format="%d"),
+            'selected': st.column_config.CheckboxColumn("Selected"),
+        },
+        key=f'instance_editor_{page_size}_{page}'
+    )
+
+    # Selections on other pages are kept as they are
+    page_ids = set(page_df['id'].tolist())
+    page_selection = set(edited.loc[edited['selected'], 'id'].tolist())
+    return (set(selected_instances) - page_ids) | page_selection
 
 
 def render_instance_info(instances: Dict[int, int],
@@ -4,8 +4,14 @@ from typing import Dict, List
 
 import streamlit as st
 
-from app.config import ACCUMULATION_STRATEGIES, VIEW_MODES, DEFAULT_DOWNSAMPLING_RATIO, DEFAULT_POINT_SIZE
+from app.config import (
+    ACCUMULATION_STRATEGIES, VIEW_MODES, DEFAULT_DOWNSAMPLING_RATIO, DEFAULT_POINT_SIZE,
+    MAX_DOWNSAMPLING_RATIO, MAX_POINTS_FOR_VISUALIZATION
+)
+from app.components.instance_selector import reset_instance_selector_state, set_selection
+from app.components.viewer_3d import reset_patched_state
 from app.services.data_service import get_scenes, get_frames, clear_cache
+from app.services.patching_service import invalidate_accumulation
 
 
 def render_sidebar() -> Dict:
@@ -29,8 +35,9 @@ def render_sidebar() -> Dict:
         # Clear dependent selections
         st.session_state['scene_id'] = None
         st.session_state['frame_id'] = None
-        st.session_state['selected_instances'] = set()
-        st.session_state['patched_point_cloud'] = None
+        set_selection(())
+        reset_instance_selector_state()
+        reset_patched_state()
 
     # Scene selector
     scenes = []
@@ -52,8 +59,9 @@ def render_sidebar() -> Dict:
     if scene_id and scene_id != st.session_state.get('scene_id'):
         st.session_state['scene_id'] = scene_id
         st.session_state['frame_id'] = None
-        st.session_state['selected_instances'] = set()
-        st.session_state['patched_point_cloud'] = None
+        set_selection(())
+        reset_instance_selector_state()
+        reset_patched_state()
 
     # Frame selector
     frames = []
@@ -74,8 +82,9 @@ def render_sidebar() -> Dict:
     # Update frame in session state
     if frame_id and frame_id != st.session_state.get('frame_id'):
         st.session_state['frame_id'] = frame_id
-        st.session_state['selected_instances'] = set()
-        st.session_state['patched_point_cloud'] = None
+        set_selection(())
+        reset_instance_selector_state()
+        reset_patched_state()
 
     st.sidebar.divider()
 
@@ -111,10 +120,10 @@ def render_sidebar() -> Dict:
     downsample_ratio = st.sidebar.slider(
         "Downsample Ratio",
         min_value=0.05,
-        max_value=1.0,
+        max_value=MAX_DOWNSAMPLING_RATIO,
         value=DEFAULT_DOWNSAMPLING_RATIO,
         step=0.05,
-        help="Fraction of points to display (lower = faster)"
+        help=f"Fraction of {MAX_POINTS_FOR_VISUALIZATION:,} points to display (lower = faster)"
     )
 
     point_size = st.sidebar.slider(
@@ -130,6 +139,7 @@ def render_sidebar() -> Dict:
     # Cache management
     if st.sidebar.button("Clear Cache", help="Clear all cached data"):
         clear_cache()
+        invalidate_accumulation()
         st.sidebar.success("Cache cleared!")
         st.rerun()
 
@@ -3,15 +3,108 @@
 from typing import Dict, Optional
 
 import numpy as np
+import plotly.graph_objects as go
 import streamlit as st
 
-from app.services.visualization_service import create_plotly_figure, create_comparison_figure
+from app.services.data_service import get_downsampled_pc
+from app.services.visualization_service import create_bundle_figure
+from app.utils.downsampling import PCBundle, point_budget, sorted_random_indices, to_pc_bundle
+
+# Number of original-frame figures kept by _original_figure (each ~1 MB)
+FIGURE_CACHE_SIZE = 8
+
+
+def reset_patched_state():
+    """Drop the patched frame together with its downsampled view and figures."""
+    for key in ('patched_point_cloud', 'patched_segments',
+                'patched_downsampled', 'patched_figures'):
+        st.session_state[key] = None
+
+
+def _downsample_patched(patched_pc: np.ndarray,
+                        patched_segments: np.ndarray,
+                        downsample_ratio: float) -> PCBundle:
+    """Downsample the patched point cloud once per (point cloud, ratio).
+
+    The result is memoized in session state, keyed on the identity of the
+    patched point cloud, so reruns triggered by unrelated widgets reuse it.
+
+    Args:
+        patched_pc: Patched point cloud (D, M)
+        patched_segments: Patched segment labels (M,)
+        downsample_ratio: Fraction of points to show, see point_budget
+
+    Returns:
+        Downsampled point cloud in viewer layout
+    """
+    cached = st.session_state.get('patched_downsampled')
+    if cached is not None and cached[0] is patched_pc and cached[1] == downsample_ratio:
+        return cached[2]
+
+    indices = sorted_random_indices(patched_pc.shape[1], point_budget(downsample_ratio))
+    bundle = to_pc_bundle(patched_pc, patched_segments, indices)
+    st.session_state['patched_downsampled'] = (patched_pc, downsample_ratio, bundle)
+    return bundle
+
+
+@st.cache_data(show_spinner=False, max_entries=FIGURE_CACHE_SIZE)
+def _original_figure(data_root: str,
+                     scene_id: str,
+                     frame_id: str,
+                     downsample_ratio: float,
+                     color_by: str) -> go.Figure:
+    """Build the figure of the original frame, cached on scalar arguments only.
+
+    Point size and title are not part of the key; callers set them on the
+    returned copy.
+
+    Args:
+        data_root: Dataset root path
+        scene_id: Scene identifier
+        frame_id: Frame identifier
+        downsample_ratio: Fraction of points to show
+        color_by: 'instance' or 'height'
+
+    Returns:
+        Plotly Figure object
+    """
+    bundle, _ = get_downsampled_pc(data_root, scene_id, frame_id, downsample_ratio)
+    return create_bundle_figure(bundle, color_by=color_by)
+
+
+def _patched_figure(patched_pc: np.ndarray,
+                    patched_segments: Optional[np.ndarray],
+                    downsample_ratio: float,
+                    color_by: str) -> go.Figure:
+    """Build the figure of the patched frame, memoized in session state.
+
+    The memo is bound to the identity of the patched point cloud, so a new
+    patching result invalidates it. Point size and title are not part of the
+    key; callers set them on the returned figure.
+
+    Args:
+        patched_pc: Patched point cloud (D, M)
+        patched_segments: Patched segment labels (M,) or None
+        downsample_ratio: Fraction of points to show
+        color_by: 'instance' or 'height'
+
+    Returns:
+        Plotly Figure object
+    """
+    params = (downsample_ratio, color_by)
+    cached = st.session_state.get('patched_figures')
+    if cached is not None and cached[0] is patched_pc and cached[1] == params:
+        return cached[2]
+
+    bundle = _downsample_patched(patched_pc, patched_segments, downsample_ratio)
+    fig = create_bundle_figure(bundle, color_by=color_by)
+    st.session_state['patched_figures'] = (patched_pc, params, fig)
+    return fig
 
 
 def render_point_cloud_viewer(config: Dict,
                               original_pc: np.ndarray,
                               patched_pc: Optional[np.ndarray],
-                              original_segments: np.ndarray,
                               patched_segments: Optional[np.ndarray]):
     """Render 3D point cloud based on view mode.
 
@@ -19,7 +112,6 @@ def render_point_cloud_viewer(config: Dict,
         config: Configuration dict from sidebar
         original_pc: Original point cloud (D, N)
         patched_pc: Patched point cloud (D, M) or None
-        original_segments: Original segment labels
         patched_segments: Patched segment labels or None
     """
     view_mode = config['view_mode']
@@ -27,65 +119,50 @@ def render_point_cloud_viewer(config: Dict,
     downsample_ratio = config['downsample_ratio']
     color_by = config['color_by']
 
-    if view_mode == "Original":
-        fig = create_plotly_figure(
-            original_pc,
-            original_segments,
-            point_size=point_size,
-            title=f"Original Point Cloud ({original_pc.shape[1]:,} points)",
-            downsample_ratio=downsample_ratio,
-            color_by=color_by
+    # Point size and title only restyle the figure, the cached ones are reused
+    def original_figure(title: str) -> go.Figure:
+        fig = _original_figure(
+            config['data_root'],
+            config['scene_id'],
+            config['frame_id'],
+            downsample_ratio,
+            color_by
         )
+        return fig.update_traces(marker_size=point_size).update_layout(title_text=title)
+
+    def patched_figure(title: str) -> go.Figure:
+        fig = _patched_figure(
+            patched_pc,
+            patched_segments,
+            downsample_ratio,
+            color_by
+        )
+        return fig.update_traces(marker_size=point_size).update_layout(title_text=title)
+
+    if view_mode == "Original":
+        fig = original_figure(f"Original Point Cloud ({original_pc.shape[1]:,} points)")
         st.plotly_chart(fig, use_container_width=True)
 
     elif view_mode == "Patched":
         if patched_pc is None:
             st.warning("No patched point cloud available. Select instances and click 'Patch' first.")
             # Show original as fallback
-            fig = create_plotly_figure(
-                original_pc,
-                original_segments,
-                point_size=point_size,
-                title=f"Original Point Cloud ({original_pc.shape[1]:,} points)",
-                downsample_ratio=downsample_ratio,
-                color_by=color_by
-            )
+            fig = original_figure(f"Original Point Cloud ({original_pc.shape[1]:,} points)")
             st.plotly_chart(fig, use_container_width=True)
         else:
-            fig = create_plotly_figure(
-                patched_pc,
-                patched_segments,
-                point_size=point_size,
-                title=f"Patched Point Cloud ({patched_pc.shape[1]:,} points)",
-                downsample_ratio=downsample_ratio,
-                color_by=color_by
-            )
+            fig = patched_figure(f"Patched Point Cloud ({patched_pc.shape[1]:,} points)")
             st.plotly_chart(fig, use_container_width=True)
 
     elif view_mode == "Side-by-Side":
         col1, col2 = st.columns(2)
 
         with col1:
-            fig1 = create_plotly_figure(
-                original_pc,
-                original_segments,
-                point_size=point_size,
-                title=f"Original ({original_pc.shape[1]:,} pts)",
-                downsample_ratio=downsample_ratio,
-                color_by=color_by
-            )
+            fig1 = original_figure(f"Original ({original_pc.shape[1]:,} pts)")
             st.plotly_chart(fig1, use_container_width=True)
 
         with col2:
             if patched_pc is not None:
-                fig2 = create_plotly_figure(
-                    patched_pc,
-                    patched_segments,
-                    point_size=point_size,
-                    title=f"Patched ({patched_pc.shape[1]:,} pts)",
-                    downsample_ratio=downsample_ratio,
-                    color_by=color_by
-                )
+                fig2 = patched_figure(f"Patched ({patched_pc.shape[1]:,} pts)")
                 st.plotly_chart(fig2, use_container_width=True)
             else:
                 st.info("Run patching to see results")
@@ -94,23 +171,9 @@ def render_point_cloud_viewer(config: Dict,
         show_patched = st.toggle("Show Patched", value=False, disabled=patched_pc is None)
 
         if show_patched and patched_pc is not None:
-            fig = create_plotly_figure(
-                patched_pc,
-                patched_segments,
-                point_size=point_size,
-                title=f"Patched Point Cloud ({patched_pc.shape[1]:,} points)",
-                downsample_ratio=downsample_ratio,
-                color_by=color_by
-            )
+            fig = patched_figure(f"Patched Point Cloud ({patched_pc.shape[1]:,} points)")
         else:
-            fig = create_plotly_figure(
-                original_pc,
-                original_segments,
-                point_size=point_size,
-                title=f"Original Point Cloud ({original_pc.shape[1]:,} points)",
-                downsample_ratio=downsample_ratio,
-                color_by=color_by
-            )
+            fig = original_figure(f"Original Point Cloud ({original_pc.shape[1]:,} points)")
 
         st.plotly_chart(fig, use_container_width=True)
 
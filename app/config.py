@@ -1,12 +1,24 @@
 """Configuration constants for the Streamlit app."""
 
+# Dataset splits scanned for scenes
+DATASET_SPLITS = ["training", "validation", "testing"]
+
 # Visualization settings
 DEFAULT_DOWNSAMPLING_RATIO = 0.2
 MAX_POINTS_FOR_VISUALIZATION = 100000
+MAX_POINTS_PER_FIGURE = 50000  # Hard cap regardless of the downsample ratio
+# Ratios above this hit MAX_POINTS_PER_FIGURE and would all look the same
+MAX_DOWNSAMPLING_RATIO = MAX_POINTS_PER_FIGURE / MAX_POINTS_FOR_VISUALIZATION
 DEFAULT_POINT_SIZE = 2
 
+# Instance selector pagination
+INSTANCE_PAGE_SIZE = 50
+INSTANCE_PAGE_SIZE_OPTIONS = [25, 50, 100]
+
 # Accumulation settings
 ACCUMULATION_STEP = 3
+# Budget for merged instance clouds kept between patches of a scene
+ACCUMULATION_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 ACCUMULATION_STRATEGIES = {
     'default': 'Simple concatenation (no registration)'
@@ -2,21 +2,21 @@
 
 import os
 import sys
+from typing import Dict, List
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import numpy as np
 import streamlit as st
 
 from app.components.sidebar import render_sidebar
-from app.components.viewer_3d import render_point_cloud_viewer, render_comparison_stats
-from app.components.instance_selector import render_instance_selector, render_instance_info
+from app.components.viewer_3d import render_point_cloud_viewer, render_comparison_stats, reset_patched_state
+from app.components.instance_selector import render_instance_selector, render_instance_info, set_selection
 from app.components.save_dialog import render_save_dialog
 from app.services.data_service import (
     get_dataset,
-    get_frame_point_cloud,
-    get_frame_segments,
-    get_frame_instances,
+    get_frame_bundle,
     group_instances_for_scene
 )
 from app.services.patching_service import PatchingService
@@ -29,8 +29,11 @@ def init_session_state():
         'scene_id': None,
         'frame_id': None,
         'selected_instances': set(),
+        'selected_instances_str': (),
         'patched_point_cloud': None,
         'patched_segments': None,
+        'patched_downsampled': None,
+        'patched_figures': None,
         'grouped_instances': None,
     }
     for key, value in defaults.items():
@@ -38,6 +41,99 @@ def init_session_state():
             st.session_state[key] = value
 
 
+@st.fragment
+def instance_panel(config: Dict,
+                   original_pc: np.ndarray,
+                   instances: Dict[int, int],
+                   grouped_instances: Dict[str, List[str]]):
+    """Render statistics, instance selection and patching controls.
+
+    Runs as a fragment: interacting with these widgets reruns only this
+    panel, not the 3D viewer. Patching results trigger a full app rerun.
+
+    Args:
+        config: Configuration dict from sidebar
+        original_pc: Original point cloud (D, N)
+        instances: Dict mapping instance_id to point_count
+        grouped_instances: Dict mapping instance_id to list of frame_ids
+    """
+    # Statistics
+    render_comparison_stats(
+        original_pc,
+        st.session_state['patched_point_cloud'],
+        st.session_state['selected_instances']
+    )
+
+    st.divider()
+
+    # Instance selection
+    selection = render_instance_selector(
+        instances,
+        st.session_state['selected_instances']
+    )
+    if selection != st.session_state['selected_instances']:
+        set_selection(selection)
+
+    # Show instance details
+    render_instance_info(
+        instances,
+        st.session_state['selected_instances'],
+        grouped_instances
+    )
+
+    st.divider()
+
+    # Patching controls
+    col1, col2, col3 = st.columns([2, 2, 4])
+
+    with col1:
+        patch_disabled = len(st.session_state['selected_instances']) == 0
+        patch_button = st.button(
+            "Patch Selected Instances",
+            type="primary",
+            disabled=patch_disabled,
+            use_container_width=True,
+            help="Apply multi-frame accumulation to selected instances"
+        )
+
+    with col2:
+        if st.button("Clear Patched", use_container_width=True):
+            reset_patched_state()
+            st.rerun()
+
+    # Handle patching
+    if patch_button:
+        progress_bar = st.progress(0, text="Starting patching...")
+
+        def update_progress(progress: float, text: str):
+            progress_bar.progress(progress, text=text)
+
+        try:
+            dataset = get_dataset(config['data_root'])
+            patching_service = PatchingService(dataset, config['strategy'])
+
+            patched_pc, patched_segments = patching_service.patch_frame(
+                scene_id=config['scene_id'],
+                frame_id=config['frame_id'],
+                instance_ids=st.session_state['selected_instances_str'],
+                grouped_instances=grouped_instances,
+                progress_callback=update_progress
+            )
+
+            st.session_state['patched_point_cloud'] = patched_pc
+            st.session_state['patched_segments'] = patched_segments
+
+            progress_bar.empty()
+            st.success(f"Patching complete! Points: {original_pc.shape[1]:,} → {patched_pc.shape[1]:,}")
+            st.rerun()
+
+        except Exception as e:
+            progress_bar.empty()
+            st.error(f"Error during patching: {str(e)}")
+            import traceback
+            st.code(traceback.format_exc())
+
+
 def main():
     st.set_page_config(
         page_title="3D Point Cloud Patching",
@@ -92,17 +188,7 @@ def main():
     # Load data
     try:
         with st.spinner("Loading frame data..."):
-            original_pc = get_frame_point_cloud(
-                config['data_root'],
-                config['scene_id'],
-                config['frame_id']
-            )
-            original_segments = get_frame_segments(
-                config['data_root'],
-                config['scene_id'],
-                config['frame_id']
-            )
-            instances = get_frame_instances(
+            original_pc, _, instances = get_frame_bundle(
                 config['data_root'],
                 config['scene_id'],
                 config['frame_id']
@@ -122,80 +208,8 @@ def main():
         st.warning(f"Could not load instance grouping: {e}")
         grouped_instances = {}
 
-    # Statistics
-    render_comparison_stats(
-        original_pc,
-        st.session_state['patched_point_cloud'],
-        st.session_state['selected_instances']
-    )
-
-    st.divider()
-
-    # Instance selection
-    st.session_state['selected_instances'] = render_instance_selector(
-        instances,
-        st.session_state['selected_instances']
-    )
-
-    # Show instance details
-    render_instance_info(
-        instances,
-        st.session_state['selected_instances'],
-        grouped_instances
-    )
-
-    st.divider()
-
-    # Patching controls
-    col1, col2, col3 = st.columns([2, 2, 4])
-
-    with col1:
-        patch_disabled = len(st.session_state['selected_instances']) == 0
-        patch_button = st.button(
-            "Patch Selected Instances",
-            type="primary",
-            disabled=patch_disabled,
-            use_container_width=True,
-            help="Apply multi-frame accumulation to selected instances"
-        )
-
-    with col2:
-        if st.button("Clear Patched", use_container_width=True):
-            st.session_state['patched_point_cloud'] = None
-            st.session_state['patched_segments'] = None
-            st.rerun()
-
-    # Handle patching
-    if patch_button:
-        progress_bar = st.progress(0, text="Starting patching...")
-
-        def update_progress(progress: float, text: str):
-            progress_bar.progress(progress, text=text)
-
-        try:
-            dataset = get_dataset(config['data_root'])
-            patching_service = PatchingService(dataset, config['strategy'])
-
-            patched_pc, patched_segments = patching_service.patch_frame(
-                scene_id=config['scene_id'],
-                frame_id=config['frame_id'],
-                instance_ids=[str(i) for i in st.session_state['selected_instances']],
-                grouped_instances=grouped_instances,
-                progress_callback=update_progress
-            )
-
-            st.session_state['patched_point_cloud'] = patched_pc
-            st.session_state['patched_segments'] = patched_segments
-
-            progress_bar.empty()
-            st.success(f"Patching complete! Points: {original_pc.shape[1]:,} → {patched_pc.shape[1]:,}")
-            st.rerun()
-
-        except Exception as e:
-            progress_bar.empty()
-            st.error(f"Error during patching: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
+    # Statistics, instance selection and patching
+    instance_panel(config, original_pc, instances, grouped_instances)
 
     st.divider()
 
@@ -204,7 +218,6 @@ def main():
         config,
         original_pc,
         st.session_state['patched_point_cloud'],
-        original_segments,
         st.session_state['patched_segments']
     )
 
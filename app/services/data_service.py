@@ -1,9 +1,13 @@
 """Data service for loading and caching dataset operations."""
 
+import hashlib
 import os
 import sys
-from typing import Dict, List, Optional, Tuple
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 
+import blosc2
 import numpy as np
 import streamlit as st
 
@@ -11,8 +15,30 @@ import streamlit as st
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.datasets.waymo.pointcept_dataset import PointceptDataset
-from src.utils.dataset_helper import group_instances_across_frames
-from app.config import EXCLUDED_SEGMENT_CLASSES
+from app.config import DATASET_SPLITS, EXCLUDED_SEGMENT_CLASSES
+from app.utils.color_utils import get_unique_instances
+from app.utils.downsampling import PCBundle, point_budget, sorted_random_indices, to_pc_bundle
+
+# On-disk grouped instances indexes, one <scene_id>.npz per scene. Kept under
+# a hidden directory of the data root: anything inside a split directory would
+# be globbed as a frame by Pointcept's WaymoDataset
+GROUPED_INSTANCES_DIR = os.path.join(".cache", "grouped_instances")
+
+# Bump when the layout or meaning of the grouped instances index changes
+GROUPED_INSTANCES_VERSION = 1
+
+# Number of frames whose loaded data is kept by get_frame_bundle
+FRAME_BUNDLE_CACHE_SIZE = 8
+
+# Largest segment id for which counting via np.bincount is cheaper than np.unique
+_BINCOUNT_MAX_ID = 2 ** 20
+
+
+class FrameBundle(NamedTuple):
+    """Frame data loaded by get_frame_bundle."""
+    point_cloud: np.ndarray
+    segments: np.ndarray
+    instances: Dict[int, int]
 
 
 @st.cache_resource
@@ -28,22 +54,49 @@ def get_dataset(data_root: str) -> PointceptDataset:
     return PointceptDataset(data_root)
 
 
-@st.cache_data
-def get_scenes(data_root: str) -> List[str]:
+def _dir_signature(*paths: str) -> Tuple[int, ...]:
+    """Modification times of directories, used as an extra cache key.
+
+    Args:
+        paths: Directory paths
+
+    Returns:
+        Tuple of mtimes in nanoseconds (0 for missing directories)
+    """
+    return tuple(os.stat(path).st_mtime_ns if os.path.isdir(path) else 0 for path in paths)
+
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _get_scenes(data_root: str, dir_sig: Tuple[int, ...]) -> Tuple[str, ...]:
+    """Cached scene listing, invalidated when dir_sig changes."""
+    dataset = get_dataset(data_root)
+    return tuple(sorted(dataset._find_scenes()))
+
+
+def get_scenes(data_root: str) -> Tuple[str, ...]:
     """Get list of available scenes in the dataset.
 
     Args:
         data_root: Root directory of the dataset
 
     Returns:
-        List of scene IDs
+        Sorted tuple of scene IDs
     """
+    split_dirs = [os.path.join(data_root, split) for split in DATASET_SPLITS]
+    return _get_scenes(data_root, _dir_signature(*split_dirs))
+
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _get_frames(data_root: str, scene_id: str, dir_sig: Tuple[int, ...]) -> Tuple[str, ...]:
+    """Cached frame listing, invalidated when dir_sig changes."""
     dataset = get_dataset(data_root)
-    return sorted(dataset.scenes)
+    scene_iterator = dataset.get_scene_iterator(scene_id)
+    # The iterator lists frame directories up front; iterating it would
+    # also load every segment.npy, which is not needed here
+    return tuple(scene_iterator.frames)
 
 
-@st.cache_data
-def get_frames(data_root: str, scene_id: str) -> List[str]:
+def get_frames(data_root: str, scene_id: str) -> Tuple[str, ...]:
     """Get list of frames for a given scene.
 
     Args:
@@ -51,22 +104,71 @@ def get_frames(data_root: str, scene_id: str) -> List[str]:
         scene_id: Scene identifier
 
     Returns:
-        List of frame IDs
+        Sorted tuple of frame IDs
     """
-    dataset = get_dataset(data_root)
-    scene_iterator = dataset.get_scene_iterator(scene_id)
-    frames = []
-    for frame_id, _ in scene_iterator:
-        frames.append(frame_id)
-    return frames
+    scene_path = get_dataset(data_root)._get_scene_path(scene_id)
+    return _get_frames(data_root, scene_id, _dir_signature(scene_path))
+
+
+def _compress(arr: np.ndarray) -> bytes:
+    """Compress an array buffer with Blosc2.
+
+    Args:
+        arr: Array to compress
+
+    Returns:
+        Compressed bytes
+    """
+    return blosc2.compress2(
+        arr.tobytes(),
+        codec=blosc2.Codec.ZSTD,
+        clevel=3,
+        filters=[blosc2.Filter.SHUFFLE],
+        typesize=arr.dtype.itemsize
+    )
+
+
+def _decompress(buf: bytes, shape: Tuple[int, ...], dtype: str) -> np.ndarray:
+    """Restore an array compressed with _compress.
+
+    Args:
+        buf: Compressed bytes
+        shape: Shape of the original array
+        dtype: Dtype string of the original array
+
+    Returns:
+        Decompressed array
+    """
+    return np.frombuffer(blosc2.decompress2(buf), dtype=dtype).reshape(shape)
 
 
 @st.cache_data
+def _get_compressed_frame_point_cloud(data_root: str,
+                                      scene_id: str,
+                                      frame_id: str) -> Tuple[bytes, Tuple[int, ...], str]:
+    """Load frame point cloud and cache it Blosc-compressed.
+
+    Args:
+        data_root: Root directory of the dataset
+        scene_id: Scene identifier
+        frame_id: Frame identifier
+
+    Returns:
+        Tuple of (compressed_bytes, shape, dtype)
+    """
+    dataset = get_dataset(data_root)
+    pc = dataset.get_frame_point_cloud(scene_id, frame_id)
+    return _compress(pc), pc.shape, pc.dtype.str
+
+
 def get_frame_point_cloud(data_root: str,
                           scene_id: str,
                           frame_id: str) -> np.ndarray:
     """Load frame point cloud.
 
+    The point cloud is cached compressed and decompressed on every call.
+    The returned array is read-only.
+
     Args:
         data_root: Root directory of the dataset
         scene_id: Scene identifier
@@ -75,16 +177,19 @@ def get_frame_point_cloud(data_root: str,
     Returns:
         Point cloud of shape (D, N)
     """
-    dataset = get_dataset(data_root)
-    return dataset.get_frame_point_cloud(scene_id, frame_id)
+    return _decompress(*_get_compressed_frame_point_cloud(data_root, scene_id, frame_id))
 
 
-@st.cache_data
+@st.cache_resource
 def get_frame_segments(data_root: str,
                        scene_id: str,
                        frame_id: str) -> np.ndarray:
     """Load frame segment labels.
 
+    The labels are memory-mapped and shared between reruns, so the
+    returned array is read-only; use np.array() on it if a writable
+    copy is needed.
+
     Args:
         data_root: Root directory of the dataset
         scene_id: Scene identifier
@@ -98,14 +203,73 @@ def get_frame_segments(data_root: str,
     segment_path = os.path.join(frame_dir, "segment.npy")
 
     if os.path.exists(segment_path):
-        return np.load(segment_path)
+        return np.load(segment_path, mmap_mode='r')
 
     # If no segment file, return -1 for all points
     pc = get_frame_point_cloud(data_root, scene_id, frame_id)
-    return np.full(pc.shape[1], -1, dtype=np.int32)
+    segments = np.full(pc.shape[1], -1, dtype=np.int32)
+    segments.flags.writeable = False
+    return segments
 
 
 @st.cache_data
+def get_downsampled_pc(data_root: str,
+                       scene_id: str,
+                       frame_id: str,
+                       ratio: float) -> Tuple[PCBundle, np.ndarray]:
+    """Downsample frame point cloud and segments for visualization.
+
+    Args:
+        data_root: Root directory of the dataset
+        scene_id: Scene identifier
+        frame_id: Frame identifier
+        ratio: Fraction of points to show, see point_budget
+
+    Returns:
+        Tuple of (downsampled point cloud in viewer layout, indices (M,))
+    """
+    points = get_frame_point_cloud(data_root, scene_id, frame_id)
+    segments = get_frame_segments(data_root, scene_id, frame_id)
+    indices = sorted_random_indices(points.shape[1], point_budget(ratio))
+    return to_pc_bundle(points, segments, indices), indices
+
+
+def _count_instance_points(segments: np.ndarray,
+                           frame_instance_ids: Set[int],
+                           excluded_classes: Tuple[int, ...]) -> Dict[int, int]:
+    """Count points of the given instances in frame segment labels.
+
+    Args:
+        segments: Segment labels of shape (N,)
+        frame_instance_ids: IDs of the instances present in the frame
+        excluded_classes: Tuple of class IDs to exclude
+
+    Returns:
+        Dict mapping instance_id to point_count
+    """
+    ids_needed = np.fromiter(frame_instance_ids - set(excluded_classes), dtype=np.int64)
+    if ids_needed.size == 0:
+        return {}
+
+    # Get point counts from segments, only for the instances we need
+    # Labels are shifted by one so that the -1 (unlabeled) points fit bincount
+    if (segments.size and ids_needed.min() >= -1
+            and segments.min() >= -1 and segments.max() < _BINCOUNT_MAX_ID):
+        minlength = int(ids_needed.max()) + 2
+        counts = np.bincount(segments + 1, minlength=minlength)[ids_needed + 1]
+    else:
+        unique_ids, unique_counts = np.unique(segments, return_counts=True)
+        if unique_ids.size == 0:
+            return dict.fromkeys(ids_needed.tolist(), 0)
+        pos = np.searchsorted(unique_ids, ids_needed)
+        clipped = pos.clip(max=unique_ids.size - 1)
+        found = (pos < unique_ids.size) & (unique_ids[clipped] == ids_needed)
+        # Instances missing from the segments get a zero count
+        counts = np.where(found, unique_counts[clipped], 0)
+
+    return dict(zip(ids_needed.tolist(), counts.tolist()))
+
+
 def get_frame_instances(data_root: str,
                         scene_id: str,
                         frame_id: str,
@@ -113,7 +277,8 @@ def get_frame_instances(data_root: str,
     """Get instances in a frame with their point counts.
 
     Uses grouped_instances to find which instances are present in this frame,
-    then gets point counts from segment data.
+    then gets point counts from segment data. Not cached itself: the app
+    reads it through get_frame_bundle.
 
     Args:
         data_root: Root directory of the dataset
@@ -127,47 +292,225 @@ def get_frame_instances(data_root: str,
     if excluded_classes is None:
         excluded_classes = tuple(EXCLUDED_SEGMENT_CLASSES)
 
-    # Get grouped instances for the scene
-    grouped = group_instances_for_scene(data_root, scene_id)
-
     # Find instances that appear in this frame
-    frame_instance_ids = set()
-    for instance_id, frame_ids in grouped.items():
-        if frame_id in frame_ids:
-            frame_instance_ids.add(int(instance_id))
+    frame_instance_ids = _frame_to_instances_index(data_root, scene_id).get(frame_id, set())
+    segments = get_frame_segments(data_root, scene_id, frame_id)
+    return _count_instance_points(segments, frame_instance_ids, excluded_classes)
+
+
+@st.cache_resource(max_entries=FRAME_BUNDLE_CACHE_SIZE)
+def get_frame_bundle(data_root: str,
+                     scene_id: str,
+                     frame_id: str) -> FrameBundle:
+    """Load everything the app needs for a frame in one pass.
 
-    # Get point counts from segments
+    Cached as a resource, so reruns share the same read-only arrays
+    instead of unpickling a fresh copy on every cache hit.
+
+    Args:
+        data_root: Root directory of the dataset
+        scene_id: Scene identifier
+        frame_id: Frame identifier
+
+    Returns:
+        FrameBundle of (point_cloud (D, N), segments (N,), instances)
+    """
+    point_cloud = get_frame_point_cloud(data_root, scene_id, frame_id)
     segments = get_frame_segments(data_root, scene_id, frame_id)
-    unique_ids, counts = np.unique(segments, return_counts=True)
-    segment_counts = {int(uid): int(cnt) for uid, cnt in zip(unique_ids, counts)}
+    instances = get_frame_instances(data_root, scene_id, frame_id)
+    return FrameBundle(point_cloud, segments, instances)
+
 
-    # Build result: only instances present in this frame (from grouped_instances)
-    instances = {}
-    for instance_id in frame_instance_ids:
-        if instance_id not in excluded_classes:
-            # Use segment count if available, otherwise estimate
-            point_count = segment_counts.get(instance_id, 0)
-            instances[instance_id] = point_count
+def _scene_signature(scene_path: str) -> str:
+    """Fingerprint the frames of a scene to invalidate the on-disk index.
 
-    return instances
+    Args:
+        scene_path: Path to the scene directory
 
+    Returns:
+        Hex digest over the index version, the excluded classes, frame ids
+        and segment.npy modification times
+    """
+    digest = hashlib.md5()
+    # The grouping drops EXCLUDED_SEGMENT_CLASSES, so editing them must
+    # invalidate indexes built with the old set
+    digest.update(f"v{GROUPED_INSTANCES_VERSION};"
+                  f"excluded:{sorted(EXCLUDED_SEGMENT_CLASSES)};".encode())
+    for frame_id in sorted(os.listdir(scene_path)):
+        frame_dir = os.path.join(scene_path, frame_id)
+        if not os.path.isdir(frame_dir):
+            continue
+        segment_path = os.path.join(frame_dir, "segment.npy")
+        mtime = os.stat(segment_path).st_mtime_ns if os.path.exists(segment_path) else 0
+        digest.update(f"{frame_id}:{mtime};".encode())
+    return digest.hexdigest()
+
+
+def _load_grouped_instances(index_path: str,
+                            signature: str) -> Optional[Dict[str, List[str]]]:
+    """Load grouped instances from the on-disk index.
 
-@st.cache_data
+    Args:
+        index_path: Path to the .npz index
+        signature: Expected scene signature
+
+    Returns:
+        Dict mapping instance_id to list of frame_ids, or None if the index
+        is missing or stale
+    """
+    if not os.path.exists(index_path):
+        return None
+
+    try:
+        with np.load(index_path, allow_pickle=False) as index:
+            if str(index['signature']) != signature:
+                return None
+            ids = index['ids'].tolist()
+            offsets = index['offsets'].tolist()
+            frames = index['frames'].tolist()
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        # Damaged or truncated index: treat as stale, the caller rebuilds it
+        return None
+
+    return {str(instance_id): frames[offsets[i]:offsets[i + 1]]
+            for i, instance_id in enumerate(ids)}
+
+
+def _save_grouped_instances(index_path: str,
+                            signature: str,
+                            grouped: Dict[str, List[str]]):
+    """Save grouped instances as a flat .npz index.
+
+    Args:
+        index_path: Path to the .npz index
+        signature: Scene signature the index is valid for
+        grouped: Dict mapping instance_id to list of frame_ids
+    """
+    frame_lists = list(grouped.values())
+    offsets = np.zeros(len(frame_lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(frame_ids) for frame_ids in frame_lists])
+    frames = [frame_id for frame_ids in frame_lists for frame_id in frame_ids]
+
+    index_dir, index_name = os.path.split(index_path)
+    # Hidden name, so an interrupted write is never mistaken for an index
+    tmp_path = os.path.join(index_dir, f".{index_name}.tmp.npz")
+    try:
+        os.makedirs(index_dir, exist_ok=True)
+        np.savez_compressed(
+            tmp_path,
+            signature=np.array(signature),
+            ids=np.array([int(k) for k in grouped.keys()], dtype=np.int64),
+            offsets=offsets,
+            frames=np.array(frames, dtype=str)
+        )
+        os.replace(tmp_path, index_path)
+    except OSError:
+        # Read-only dataset: keep the in-process cache only
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _load_frame_instance_ids(frame_dir: str) -> List[int]:
+    """Read the non-excluded instance IDs present in a frame.
+
+    Args:
+        frame_dir: Path to the frame directory
+
+    Returns:
+        Sorted list of instance IDs
+    """
+    segment_path = os.path.join(frame_dir, "segment.npy")
+    if not os.path.exists(segment_path):
+        return []
+    return get_unique_instances(np.load(segment_path, mmap_mode='r'), EXCLUDED_SEGMENT_CLASSES)
+
+
+def _parallel_group(scene_id: str,
+                    dataset: PointceptDataset) -> Dict[int, List[str]]:
+    """Group instances across frames, reading segment files in a thread pool.
+
+    Produces the same result as group_instances_across_frames; only the
+    per-frame segment reads are overlapped.
+
+    Args:
+        scene_id: Scene identifier
+        dataset: PointceptDataset instance
+
+    Returns:
+        Dict mapping instance_id to list of frame_ids
+    """
+    scene_path = dataset._get_scene_path(scene_id)
+    frame_ids = sorted(f for f in os.listdir(scene_path)
+                       if os.path.isdir(os.path.join(scene_path, f)))
+    frame_dirs = [os.path.join(scene_path, frame_id) for frame_id in frame_ids]
+
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # map keeps frame order, so the frame lists stay sorted
+        frame_instance_ids = list(pool.map(_load_frame_instance_ids, frame_dirs))
+
+    grouped = {}
+    for frame_id, instance_ids in zip(frame_ids, frame_instance_ids):
+        for instance_id in instance_ids:
+            grouped.setdefault(instance_id, []).append(frame_id)
+    return grouped
+
+
+@st.cache_resource
 def group_instances_for_scene(data_root: str,
                               scene_id: str) -> Dict[str, List[str]]:
     """Group instances across all frames in a scene.
 
+    The grouping is persisted under GROUPED_INSTANCES_DIR in the data root,
+    so new sessions do not have to scan every frame again.
+    The returned dict is shared across reruns instead of being unpickled
+    on every call, so callers must treat it as read-only.
+
+    Frame lists are kept ordered rather than as sets: PointCloudAccumulator
+    samples every ACCUMULATION_STEP-th frame by position. Use
+    _frame_to_instances_index for frame membership lookups.
+
     Args:
         data_root: Root directory of the dataset
         scene_id: Scene identifier
 
     Returns:
-        Dict mapping instance_id to list of frame_ids
+        Dict mapping instance_id to list of frame_ids in frame order
     """
     dataset = get_dataset(data_root)
-    grouped = group_instances_across_frames(scene_id, dataset)
+    scene_path = dataset._get_scene_path(scene_id)
+    index_path = os.path.join(data_root, GROUPED_INSTANCES_DIR, f"{scene_id}.npz")
+    signature = _scene_signature(scene_path)
+
+    grouped = _load_grouped_instances(index_path, signature)
+    if grouped is not None:
+        return grouped
+
+    grouped = _parallel_group(scene_id, dataset)
     # Convert keys to strings for consistency
-    return {str(k): v for k, v in grouped.items()}
+    grouped = {str(k): v for k, v in grouped.items()}
+    _save_grouped_instances(index_path, signature, grouped)
+    return grouped
+
+
+@st.cache_resource
+def _frame_to_instances_index(data_root: str,
+                              scene_id: str) -> Dict[str, Set[int]]:
+    """Invert grouped instances into a frame to instances lookup.
+
+    Args:
+        data_root: Root directory of the dataset
+        scene_id: Scene identifier
+
+    Returns:
+        Dict mapping frame_id to set of instance IDs present in that frame
+    """
+    grouped = group_instances_for_scene(data_root, scene_id)
+    index = {}
+    for instance_id, frame_ids in grouped.items():
+        for frame_id in frame_ids:
+            index.setdefault(frame_id, set()).add(int(instance_id))
+    return index
 
 
 def clear_cache():
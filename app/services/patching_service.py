@@ -1,25 +1,71 @@
 """Patching service for orchestrating point cloud accumulation and patching."""
 
-import os
-import sys
-from typing import Dict, List, Set, Tuple, Optional
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Sequence, Set, Tuple, Optional
 
 import numpy as np
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from app.config import ACCUMULATION_CACHE_MAX_BYTES, ACCUMULATION_STEP
 
-from src.datasets.waymo.pointcept_dataset import PointceptDataset
-from src.accumulation.point_cloud_accumulator import PointCloudAccumulator
-from src.accumulation.accumulation_strategy import AccumulationStrategy
-from src.accumulation.default_accumulator_strategy import DefaultAccumulatorStrategy
-from app.config import ACCUMULATION_STEP
+# Dataset and accumulation modules are imported lazily so that importing
+# this service stays cheap on app cold start
+if TYPE_CHECKING:
+    from src.accumulation.accumulation_strategy import AccumulationStrategy
+    from src.accumulation.point_cloud_accumulator import PointCloudAccumulator
+    from src.datasets.waymo.pointcept_dataset import PointceptDataset
+
+# Strategy instances are stateless, so one per name is shared
+_STRATEGIES: Dict[str, 'AccumulationStrategy'] = {}
+
+
+class _SceneAccumulation(NamedTuple):
+    """Accumulator of one scene with the instance clouds it already merged."""
+    scene_id: str
+    dataset: 'PointceptDataset'
+    grouped_instances: Dict[str, List[str]]
+    accumulator: 'PointCloudAccumulator'
+    # (strategy, instance_id) -> cloud, least recently used first
+    merged: 'OrderedDict[Tuple[str, str], np.ndarray]'
+
+
+# Only the last patched scene is kept: patching usually moves frame by frame
+# through one scene. Its merged clouds are bounded by ACCUMULATION_CACHE_MAX_BYTES
+_scene_accumulation: Optional[_SceneAccumulation] = None
+# Shared by all sessions, so cache updates are serialized
+_accumulation_lock = threading.Lock()
+
+
+def invalidate_accumulation():
+    """Drop the cached accumulator and merged instance clouds."""
+    global _scene_accumulation
+    with _accumulation_lock:
+        _scene_accumulation = None
+
+
+def _retain_merged(scene: _SceneAccumulation,
+                   clouds: Dict[Tuple[str, str], np.ndarray]):
+    """Mark clouds as most recently used and evict down to the byte budget.
+
+    Args:
+        scene: Scene whose merged clouds are updated
+        clouds: Clouds used by the patch that just finished
+    """
+    with _accumulation_lock:
+        for key, cloud in clouds.items():
+            scene.merged[key] = cloud
+            scene.merged.move_to_end(key)
+
+        total = sum(cloud.nbytes for cloud in scene.merged.values())
+        while scene.merged and total > ACCUMULATION_CACHE_MAX_BYTES:
+            _, evicted = scene.merged.popitem(last=False)
+            total -= evicted.nbytes
 
 
 class PatchingService:
     """Service for patching point clouds with accumulated instances."""
 
-    def __init__(self, dataset: PointceptDataset, strategy: str = 'default'):
+    def __init__(self, dataset: 'PointceptDataset', strategy: str = 'default'):
         """Initialize patching service.
 
         Args:
@@ -30,7 +76,7 @@ class PatchingService:
         self.strategy = self._get_strategy(strategy)
         self.strategy_name = strategy
 
-    def _get_strategy(self, strategy_name: str) -> AccumulationStrategy:
+    def _get_strategy(self, strategy_name: str) -> 'AccumulationStrategy':
         """Get accumulation strategy by name.
 
         Args:
@@ -39,12 +85,47 @@ class PatchingService:
         Returns:
             AccumulationStrategy instance
         """
-        return DefaultAccumulatorStrategy()
+        strategy = _STRATEGIES.get(strategy_name)
+        if strategy is None:
+            from src.accumulation.default_accumulator_strategy import DefaultAccumulatorStrategy
+            strategy = _STRATEGIES[strategy_name] = DefaultAccumulatorStrategy()
+        return strategy
+
+    def _get_scene_accumulation(self,
+                                scene_id: str,
+                                grouped_instances: Dict[str, List[str]]) -> _SceneAccumulation:
+        """Get the accumulator of a scene, reusing it across patch calls.
+
+        The cached accumulator is reused while the dataset and the
+        grouped_instances object are the same ones it was built from.
+
+        Args:
+            scene_id: Scene identifier
+            grouped_instances: Dict mapping instance_id to list of frame_ids
+
+        Returns:
+            _SceneAccumulation of the scene
+        """
+        global _scene_accumulation
+        with _accumulation_lock:
+            scene = _scene_accumulation
+            if (scene is None or scene.scene_id != scene_id or scene.dataset is not self.dataset
+                    or scene.grouped_instances is not grouped_instances):
+                from src.accumulation.point_cloud_accumulator import PointCloudAccumulator
+
+                accumulator = PointCloudAccumulator(
+                    step=ACCUMULATION_STEP,
+                    grouped_instances=grouped_instances,
+                    dataset=self.dataset
+                )
+                scene = _scene_accumulation = _SceneAccumulation(
+                    scene_id, self.dataset, grouped_instances, accumulator, OrderedDict())
+            return scene
 
     def patch_frame(self,
                     scene_id: str,
                     frame_id: str,
-                    instance_ids: List[str],
+                    instance_ids: Sequence[str],
                     grouped_instances: Dict[str, List[str]],
                     progress_callback=None) -> Tuple[np.ndarray, np.ndarray]:
         """Patch a frame with accumulated instances.
@@ -52,24 +133,21 @@ class PatchingService:
         Args:
             scene_id: Scene identifier
             frame_id: Frame identifier
-            instance_ids: List of instance IDs to patch
+            instance_ids: Sequence of instance IDs to patch
             grouped_instances: Dict mapping instance_id to list of frame_ids
             progress_callback: Optional callback for progress updates
 
         Returns:
             Tuple of (patched_point_cloud, patched_segments)
         """
-        # Create accumulator
-        accumulator = PointCloudAccumulator(
-            step=ACCUMULATION_STEP,
-            grouped_instances=grouped_instances,
-            dataset=self.dataset
-        )
+        scene = self._get_scene_accumulation(scene_id, grouped_instances)
 
         # Load frame patcher
         patcher = self.dataset.load_frame_patcher(scene_id, frame_id)
 
-        # Patch each selected instance
+        # Accumulate each selected instance, then patch the frame once
+        items = []
+        used = {}
         total = len(instance_ids)
         for i, instance_id in enumerate(instance_ids):
             if progress_callback:
@@ -79,16 +157,28 @@ class PatchingService:
             if instance_id not in grouped_instances:
                 continue
 
-            # Accumulate point cloud for this instance
-            accumulated_pc = accumulator.merge(
-                scene_id=scene_id,
-                instance_id=instance_id,
-                accumulation_strategy=self.strategy
-            )
-
-            # Patch the frame with accumulated point cloud
-            # Important: copy to avoid state carryover
-            patcher.patch_instance(instance_id, np.copy(accumulated_pc))
+            # Accumulate point cloud for this instance, unless an earlier
+            # patch of this scene already did
+            key = (self.strategy_name, instance_id)
+            with _accumulation_lock:
+                accumulated_pc = scene.merged.get(key)
+            if accumulated_pc is None:
+                accumulated_pc = scene.accumulator.merge(
+                    scene_id=scene_id,
+                    instance_id=instance_id,
+                    accumulation_strategy=self.strategy
+                )
+                # Patchers must not modify their input: read-only flags
+                # catch any regression instead of silently carrying state over
+                accumulated_pc.setflags(write=False)
+
+            used[key] = accumulated_pc
+            items.append((instance_id, accumulated_pc))
+
+        # Single rebuild of the frame instead of one hstack per instance
+        patcher.patch_instances_bulk(items)
+        # Keep what fits in the budget for the next patch, drop the rest
+        _retain_merged(scene, used)
 
         if progress_callback:
             progress_callback(1.0, "Patching complete!")
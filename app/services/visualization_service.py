@@ -4,10 +4,19 @@ from typing import List, Optional, Tuple
 
 import numpy as np
 import plotly.graph_objects as go
+import plotly.io as pio
 
-from app.utils.color_utils import colorize_by_instance, colorize_by_height
-from app.utils.downsampling import random_downsample
-from app.config import MAX_POINTS_FOR_VISUALIZATION, DEFAULT_POINT_SIZE
+from app.utils.color_utils import (
+    BACKGROUND_INDEX,
+    colorize_by_height,
+    instance_color_indices,
+    instance_colorscale
+)
+from app.utils.downsampling import PCBundle, point_budget, random_downsample, to_pc_bundle
+from app.config import DEFAULT_POINT_SIZE
+
+# Serialize figures with orjson, which encodes numpy buffers much faster
+pio.json.config.default_engine = 'orjson'
 
 
 def create_plotly_figure(points: np.ndarray,
@@ -32,46 +41,72 @@ def create_plotly_figure(points: np.ndarray,
         Plotly Figure object
     """
     n_points = points.shape[1]
-    max_points = int(MAX_POINTS_FOR_VISUALIZATION * downsample_ratio)
+    max_points = point_budget(downsample_ratio)
 
     # Downsample if needed
     if n_points > max_points:
         points, segments = random_downsample(points, max_points, segments)
 
-    # Extract coordinates (transpose to N, 3)
-    x = points[0, :]
-    y = points[1, :]
-    z = points[2, :]
+    return create_bundle_figure(
+        to_pc_bundle(points, segments),
+        point_size=point_size,
+        title=title,
+        color_by=color_by
+    )
+
+
+def create_bundle_figure(bundle: PCBundle,
+                         point_size: int = DEFAULT_POINT_SIZE,
+                         title: str = "Point Cloud",
+                         color_by: str = "instance") -> go.Figure:
+    """Create a Plotly 3D scatter plot from a point cloud in viewer layout.
+
+    Args:
+        bundle: Already downsampled point cloud
+        point_size: Size of points in the visualization
+        title: Title of the plot
+        color_by: 'instance' or 'height'
+
+    Returns:
+        Plotly Figure object
+    """
+    segments = bundle.segments
+    # xyz is column-major, so the per-axis columns are contiguous views
+    x = bundle.xyz[:, 0]
+    y = bundle.xyz[:, 1]
+    z = bundle.xyz[:, 2]
 
     # Determine colors
     if color_by == "instance" and segments is not None:
-        colors = colorize_by_instance(segments)
-        # Convert to RGB string for plotly
-        color_strings = [f'rgb({int(c[0]*255)},{int(c[1]*255)},{int(c[2]*255)})'
-                        for c in colors]
+        # Send a uint8 palette index per point instead of an RGB string
         marker_config = dict(
             size=point_size,
-            color=color_strings,
+            color=instance_color_indices(segments),
+            colorscale=instance_colorscale(),
+            cmin=-0.5,
+            cmax=BACKGROUND_INDEX + 0.5,
+            showscale=False,
             opacity=0.8
         )
     else:
         # Color by height
-        colors = colorize_by_height(points)
+        colors = colorize_by_height(bundle.xyz.T).astype(np.float32, copy=False)
         marker_config = dict(
             size=point_size,
             color=colors,
             colorscale='Viridis',
+            # Heights are normalized, so Plotly does not need to scan for the range
+            cmin=0.0,
+            cmax=1.0,
             opacity=0.8,
             colorbar=dict(title='Height (Z)')
         )
 
-    # Create hover text
+    # Hover labels are formatted client-side by Plotly
+    hover_template = 'X: %{x:.2f}<br>Y: %{y:.2f}<br>Z: %{z:.2f}'
     if segments is not None:
-        hover_text = [f'X: {x[i]:.2f}<br>Y: {y[i]:.2f}<br>Z: {z[i]:.2f}<br>Instance: {segments[i]}'
-                      for i in range(len(x))]
-    else:
-        hover_text = [f'X: {x[i]:.2f}<br>Y: {y[i]:.2f}<br>Z: {z[i]:.2f}'
-                      for i in range(len(x))]
+        hover_template += '<br>Instance: %{customdata}'
+    hover_template += '<extra></extra>'
 
     # Create 3D scatter plot
     fig = go.Figure(data=[go.Scatter3d(
@@ -80,8 +115,8 @@ def create_plotly_figure(points: np.ndarray,
         z=z,
         mode='markers',
         marker=marker_config,
-        hovertext=hover_text,
-        hoverinfo='text'
+        customdata=segments,
+        hovertemplate=hover_template
     )])
 
     # Layout configuration
@@ -97,7 +132,9 @@ def create_plotly_figure(points: np.ndarray,
             )
         ),
         margin=dict(l=0, r=0, t=40, b=0),
-        height=600
+        height=600,
+        # Keep camera and zoom across reruns instead of resetting the scene
+        uirevision='const'
     )
 
     return fig
@@ -152,16 +189,20 @@ def get_point_cloud_stats(points: np.ndarray,
     Returns:
         Dict with statistics
     """
+    # One pass per reduction over all three coordinate rows
+    xyz = points[:3]
+    mins = xyz.min(axis=1)
+    maxs = xyz.max(axis=1)
     stats = {
         'num_points': points.shape[1],
-        'x_range': (float(points[0, :].min()), float(points[0, :].max())),
-        'y_range': (float(points[1, :].min()), float(points[1, :].max())),
-        'z_range': (float(points[2, :].min()), float(points[2, :].max())),
+        'x_range': (float(mins[0]), float(maxs[0])),
+        'y_range': (float(mins[1]), float(maxs[1])),
+        'z_range': (float(mins[2]), float(maxs[2])),
     }
 
     if segments is not None:
         unique_instances = np.unique(segments)
         stats['num_instances'] = len(unique_instances)
-        stats['instance_ids'] = [int(i) for i in unique_instances if i >= 0]
+        stats['instance_ids'] = unique_instances[unique_instances >= 0].tolist()
 
     return stats
@@ -31,6 +31,12 @@ INSTANCE_COLORS = [
 # Background/unlabeled color
 BACKGROUND_COLOR = (128, 128, 128)  # Gray
 
+# Palette index of BACKGROUND_COLOR, right after the instance colors
+BACKGROUND_INDEX = len(INSTANCE_COLORS)
+
+# Instance colors followed by the background color, normalized to 0-1
+INSTANCE_PALETTE = np.array(INSTANCE_COLORS + [BACKGROUND_COLOR], dtype=np.float32) / 255.0
+
 
 def instance_id_to_color(instance_id: int) -> Tuple[int, int, int]:
     """Convert instance ID to RGB color deterministically.
@@ -55,14 +61,50 @@ def colorize_by_instance(segments: np.ndarray) -> np.ndarray:
     Returns:
         RGB colors of shape (N, 3) normalized to 0-1
     """
-    n_points = len(segments)
-    colors = np.zeros((n_points, 3), dtype=np.float32)
+    return INSTANCE_PALETTE[instance_color_indices(segments)]
+
+
+def instance_color_indices(segments: np.ndarray) -> np.ndarray:
+    """Map points to palette indices, matching instance_id_to_color.
+
+    Args:
+        segments: Segment labels of shape (N,)
+
+    Returns:
+        uint8 indices of shape (N,): INSTANCE_COLORS index, or
+        BACKGROUND_INDEX for negative IDs
+    """
+    indices = np.mod(segments, len(INSTANCE_COLORS)).astype(np.uint8)
+    indices[segments < 0] = BACKGROUND_INDEX
+    return indices
 
-    for i, seg_id in enumerate(segments):
-        color = instance_id_to_color(int(seg_id))
-        colors[i] = np.array(color) / 255.0
 
-    return colors
+def _build_instance_colorscale() -> Tuple[Tuple[float, str], ...]:
+    """Two stops per palette color, so each color covers a flat band."""
+    palette = INSTANCE_COLORS + [BACKGROUND_COLOR]
+    n_colors = len(palette)
+    colorscale = []
+    for i, (r, g, b) in enumerate(palette):
+        color = f'rgb({r},{g},{b})'
+        colorscale.append((i / n_colors, color))
+        colorscale.append(((i + 1) / n_colors, color))
+    return tuple(colorscale)
+
+
+# Built once: the palette is constant and every instance figure uses it
+_INSTANCE_COLORSCALE = _build_instance_colorscale()
+
+
+def instance_colorscale() -> Tuple[Tuple[float, str], ...]:
+    """Discrete Plotly colorscale for instance_color_indices values.
+
+    Use with cmin=-0.5 and cmax=BACKGROUND_INDEX + 0.5 so each index
+    falls in the middle of its own color band.
+
+    Returns:
+        Plotly colorscale, shared and immutable
+    """
+    return _INSTANCE_COLORSCALE
 
 
 def colorize_by_height(points: np.ndarray,
@@ -108,8 +150,8 @@ def get_unique_instances(segments: np.ndarray,
     Returns:
         List of unique instance IDs
     """
-    if excluded_classes is None:
-        excluded_classes = set()
-
     unique_ids = np.unique(segments)
-    return [int(uid) for uid in unique_ids if int(uid) not in excluded_classes]
+    if excluded_classes:
+        excluded = np.fromiter(excluded_classes, dtype=np.int64, count=len(excluded_classes))
+        unique_ids = np.setdiff1d(unique_ids, excluded, assume_unique=True)
+    return unique_ids.tolist()
@@ -1,18 +1,112 @@
 """Downsampling utilities for point cloud visualization."""
 
+import threading
+
 import numpy as np
-from typing import Tuple
+from numba import njit, types
+from numba.typed import Dict
+from typing import NamedTuple, Optional, Tuple
+
+from app.config import MAX_POINTS_FOR_VISUALIZATION, MAX_POINTS_PER_FIGURE
+
+# Voxel indices are packed into one int64 key, 21 bits per axis
+_VOXEL_KEY_BITS = 21
+_VOXEL_KEY_OFFSET = 1 << (_VOXEL_KEY_BITS - 1)
+
+# Largest voxel grid (in cells) that gets a dense one-byte occupancy buffer
+_DENSE_GRID_MAX_CELLS = 1 << 24
+
+# Per-thread generators for random_downsample: Streamlit runs sessions in
+# separate threads, and a shared Generator serializes them on its lock
+_thread_rng = threading.local()
+
+
+def _philox(seed: Optional[int] = None) -> np.random.Generator:
+    """Philox generator, seeded from OS entropy when seed is None."""
+    return np.random.Generator(np.random.Philox(np.random.SeedSequence(seed)))
+
+
+def _get_rng() -> np.random.Generator:
+    """Get this thread's generator, creating it on first use."""
+    rng = getattr(_thread_rng, 'rng', None)
+    if rng is None:
+        rng = _thread_rng.rng = _philox()
+    return rng
+
+
+class PCBundle(NamedTuple):
+    """Point cloud in viewer layout, one contiguous array per attribute."""
+    xyz: np.ndarray  # (N, 3) float32, column-major so each axis is contiguous
+    segments: Optional[np.ndarray]  # (N,), int16 when the labels fit
+
+
+def to_pc_bundle(points: np.ndarray,
+                 segments: np.ndarray = None,
+                 indices: np.ndarray = None) -> PCBundle:
+    """Convert a (D, N) point cloud to the (N, 3) viewer layout.
+
+    Only XYZ and the segment labels are kept, the viewer colors by instance
+    or height.
+
+    Args:
+        points: Point cloud of shape (D, N), first 3 rows are XYZ
+        segments: Optional segment labels of shape (N,)
+        indices: Optional indices of the points to keep
+
+    Returns:
+        PCBundle with the selected points
+    """
+    if indices is not None:
+        points = points[:, indices]
+        if segments is not None:
+            segments = segments[indices]
+
+    xyz = np.asfortranarray(points[:3, :].T, dtype=np.float32)
+
+    # Segment labels are small class IDs, keep them compact when they fit
+    if segments is not None:
+        if (segments.size and segments.min() >= np.iinfo(np.int16).min
+                and segments.max() <= np.iinfo(np.int16).max):
+            segments = segments.astype(np.int16)
+        else:
+            segments = np.ascontiguousarray(segments)
+
+    return PCBundle(xyz, segments)
+
+
+@njit(cache=True)
+def _stride_sample(n_points: int, jitter: np.ndarray) -> np.ndarray:
+    """Pick one index per stride, offset by jitter within the stride.
+
+    Strides are [floor(i * step), floor((i + 1) * step)), so the indices
+    are unique and sorted. Serial on purpose: it is called from Streamlit's
+    per-session threads, and Numba's default workqueue threading layer
+    aborts the process on concurrent parallel launches.
+    """
+    n_samples = jitter.shape[0]
+    step = n_points / n_samples
+    out = np.empty(n_samples, np.int64)
+    for i in range(n_samples):
+        start = np.int64(i * step)
+        end = np.int64((i + 1) * step)
+        out[i] = start + np.int64(jitter[i] * (end - start))
+    return out
 
 
 def random_downsample(points: np.ndarray,
                       max_points: int,
-                      segments: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+                      segments: np.ndarray = None,
+                      seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
     """Randomly downsample point cloud for visualization.
 
+    Points are returned as float32: the viewer renders in single precision
+    anyway, and it halves the bytes carried to Plotly.
+
     Args:
         points: Point cloud of shape (D, N) where D is dimensions, N is points
         max_points: Maximum number of points to keep
         segments: Optional segment labels of shape (N,)
+        seed: Optional seed for a reproducible sample
 
     Returns:
         Tuple of (downsampled_points, downsampled_segments or indices)
@@ -20,23 +114,119 @@ def random_downsample(points: np.ndarray,
     n_points = points.shape[1]
 
     if n_points <= max_points:
+        points = points.astype(np.float32, copy=False)
         if segments is not None:
             return points, segments
         return points, np.arange(n_points)
 
-    indices = np.random.choice(n_points, size=max_points, replace=False)
-    downsampled_points = points[:, indices]
+    # Smallest random keys pick the sample: O(N) partition instead of a full shuffle
+    rng = _get_rng() if seed is None else _philox(seed)
+    keys = rng.random(n_points, dtype=np.float32)
+    indices = np.argpartition(keys, max_points)[:max_points]
+    indices.sort()
+    downsampled_points = points[:, indices].astype(np.float32, copy=False)
 
     if segments is not None:
         return downsampled_points, segments[indices]
     return downsampled_points, indices
 
 
+def point_budget(downsample_ratio: float) -> int:
+    """Number of points to show for a downsample ratio.
+
+    Args:
+        downsample_ratio: Fraction of MAX_POINTS_FOR_VISUALIZATION to show
+
+    Returns:
+        Point budget, capped at MAX_POINTS_PER_FIGURE
+    """
+    return min(int(MAX_POINTS_FOR_VISUALIZATION * downsample_ratio), MAX_POINTS_PER_FIGURE)
+
+
+def sorted_random_indices(n_points: int,
+                          max_points: int,
+                          seed: int = 0) -> np.ndarray:
+    """Pick a reproducible random subset of point indices.
+
+    Uses jittered uniform strides, which is linear in max_points instead of
+    sampling without replacement over all points.
+
+    Args:
+        n_points: Number of points in the point cloud
+        max_points: Maximum number of points to keep
+        seed: Seed of the random generator
+
+    Returns:
+        Sorted indices of shape (min(n_points, max_points),)
+    """
+    if n_points <= max_points:
+        return np.arange(n_points)
+
+    return _stride_sample(n_points, _philox(seed).random(max_points))
+
+
+@njit(cache=True)
+def _voxel_keys(coords: np.ndarray, voxel_size: float) -> np.ndarray:
+    """Pack the voxel index of every point into an int64 key.
+
+    Serial like _stride_sample, so concurrent sessions never share a
+    Numba parallel region.
+    """
+    n_points = coords.shape[0]
+    keys = np.empty(n_points, np.int64)
+    for i in range(n_points):
+        ix = np.int64(np.floor(coords[i, 0] / voxel_size)) + _VOXEL_KEY_OFFSET
+        iy = np.int64(np.floor(coords[i, 1] / voxel_size)) + _VOXEL_KEY_OFFSET
+        iz = np.int64(np.floor(coords[i, 2] / voxel_size)) + _VOXEL_KEY_OFFSET
+        keys[i] = (ix << (2 * _VOXEL_KEY_BITS)) | (iy << _VOXEL_KEY_BITS) | iz
+    return keys
+
+
+@njit(cache=True)
+def _first_occurrences(keys: np.ndarray) -> np.ndarray:
+    """Indices of the first point of every distinct key, in point order."""
+    seen = Dict.empty(key_type=types.int64, value_type=types.int64)
+    keep = np.zeros(keys.shape[0], np.bool_)
+    for i in range(keys.shape[0]):
+        if keys[i] not in seen:
+            seen[keys[i]] = i
+            keep[i] = True
+    return np.nonzero(keep)[0]
+
+
+@njit(cache=True)
+def _grid_cells(coords: np.ndarray, voxel_size: float,
+                origin: np.ndarray, dims: np.ndarray) -> np.ndarray:
+    """Linear index of the voxel of every point in a dense grid."""
+    n_points = coords.shape[0]
+    cells = np.empty(n_points, np.int64)
+    for i in range(n_points):
+        ix = np.int64(np.floor(coords[i, 0] / voxel_size)) - origin[0]
+        iy = np.int64(np.floor(coords[i, 1] / voxel_size)) - origin[1]
+        iz = np.int64(np.floor(coords[i, 2] / voxel_size)) - origin[2]
+        cells[i] = (ix * dims[1] + iy) * dims[2] + iz
+    return cells
+
+
+@njit(cache=True)
+def _grid_first_occurrences(cells: np.ndarray, n_cells: int) -> np.ndarray:
+    """Indices of the first point in every occupied cell, in point order."""
+    occupied = np.zeros(n_cells, np.uint8)
+    keep = np.zeros(cells.shape[0], np.bool_)
+    for i in range(cells.shape[0]):
+        if occupied[cells[i]] == 0:
+            occupied[cells[i]] = 1
+            keep[i] = True
+    return np.nonzero(keep)[0]
+
+
 def voxel_downsample(points: np.ndarray,
                      voxel_size: float = 0.1,
                      segments: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
     """Voxel-based downsampling for more uniform distribution.
 
+    Keeps the first point of every occupied voxel, in point order.
+
     Args:
         points: Point cloud of shape (D, N)
         voxel_size: Size of voxels for downsampling
@@ -45,13 +235,27 @@ def voxel_downsample(points: np.ndarray,
     Returns:
         Tuple of (downsampled_points, downsampled_segments or indices)
     """
-    coords = points[:3, :].T  # (N, 3)
+    coords = np.ascontiguousarray(points[:3, :].T, dtype=np.float64)  # (N, 3)
 
-    # Compute voxel indices
-    voxel_indices = np.floor(coords / voxel_size).astype(np.int32)
+    if coords.shape[0] == 0:
+        unique_indices = np.arange(0)
+    else:
+        lo = np.floor(coords.min(axis=0) / voxel_size).astype(np.int64)
+        hi = np.floor(coords.max(axis=0) / voxel_size).astype(np.int64)
+        dims = hi - lo + 1
+        n_cells = float(np.prod(dims.astype(np.float64)))
 
-    # Get unique voxels and keep one point per voxel
-    _, unique_indices = np.unique(voxel_indices, axis=0, return_index=True)
+        if n_cells <= _DENSE_GRID_MAX_CELLS:
+            # Bounded extent: write-once dense grid, no hashing
+            cells = _grid_cells(coords, voxel_size, lo, dims)
+            unique_indices = _grid_first_occurrences(cells, int(n_cells))
+        elif lo.min() >= -_VOXEL_KEY_OFFSET and hi.max() < _VOXEL_KEY_OFFSET:
+            unique_indices = _first_occurrences(_voxel_keys(coords, voxel_size))
+        else:
+            # Voxel grid too large to pack into a key, fall back to sorting
+            voxel_indices = np.floor(coords / voxel_size).astype(np.int64)
+            _, unique_indices = np.unique(voxel_indices, axis=0, return_index=True)
+            unique_indices.sort()
 
     downsampled_points = points[:, unique_indices]
 
@@ -1,6 +1,7 @@
 import numpy as np
 
 from abc import ABC, abstractmethod
+from typing import List, Tuple
 
 
 class FramePatcher(ABC):
@@ -39,3 +40,16 @@ class FramePatcher(ABC):
             New point cloud.
         """
         ...
+
+    def patch_instances_bulk(self,
+                             items: List[Tuple[str, np.ndarray]]):
+        """Replaces point clouds of several instances in the frame.
+
+        Equivalent to calling patch_instance for every item in order.
+        Patchers may override it to rebuild the frame only once.
+
+        :param items: list[tuple[str, np.ndarray[float]]]
+            Pairs of instance ID and new point cloud.
+        """
+        for instance_id, point_cloud in items:
+            self.patch_instance(instance_id, point_cloud)
@@ -8,7 +8,7 @@ from abc import ABC, abstractmethod
 from pyquaternion import Quaternion
 import os
 import numpy as np
-from typing import Optional, Iterable, List
+from typing import Optional, Iterable, List, Tuple
 from abc import ABC, abstractmethod
 import shutil
 
@@ -182,6 +182,19 @@ class FramePatcher(ABC):
         """
         ...
 
+    def patch_instances_bulk(self,
+                             items: List[Tuple[str, np.ndarray]]):
+        """Replaces point clouds of several instances in the frame.
+
+        Equivalent to calling patch_instance for every item in order.
+        Patchers may override it to rebuild the frame only once.
+
+        :param items: list[tuple[str, np.ndarray[float]]]
+            Pairs of instance ID and new point cloud.
+        """
+        for instance_id, point_cloud in items:
+            self.patch_instance(instance_id, point_cloud)
+
 class FrameDescriptor(object):
     def __init__(self,
                  frame_id: str,
@@ -348,6 +361,38 @@ class PointceptFramePatcher(FramePatcher):
         new_segments = np.full(local_points.shape[1], int(instance_id), dtype=np.int32)
         self._segments = np.hstack([self._segments[~mask], new_segments])
 
+    def patch_instances_bulk(self, items: List[Tuple[str, np.ndarray]]):
+        """Заменяет точки нескольких экземпляров одной конкатенацией."""
+        if not items:
+            return
+
+        target_pose = np.load(os.path.join(self.frame_dir, "pose.npy"))
+        local_clouds = [self.dataset.reapply_frame_transformation(point_cloud, target_pose)
+                        for _, point_cloud in items]
+
+        # Удаляем старые точки всех экземпляров одной маской
+        instance_ids = np.array([int(instance_id) for instance_id, _ in items])
+        keep = ~np.isin(self._segments, instance_ids)
+        n_keep = int(keep.sum())
+        n_total = n_keep + sum(cloud.shape[1] for cloud in local_clouds)
+
+        # Выделяем выходные буферы один раз и копируем части по срезам
+        pointcloud = np.empty((self._pointcloud.shape[0], n_total),
+                              dtype=np.result_type(self._pointcloud, *local_clouds))
+        segments = np.empty(n_total, dtype=np.result_type(self._segments, np.int32))
+        pointcloud[:, :n_keep] = self._pointcloud[:, keep]
+        segments[:n_keep] = self._segments[keep]
+
+        offset = n_keep
+        for instance_id, local_points in zip(instance_ids, local_clouds):
+            end = offset + local_points.shape[1]
+            np.copyto(pointcloud[:, offset:end], local_points)
+            segments[offset:end] = instance_id
+            offset = end
+
+        self._pointcloud = pointcloud
+        self._segments = segments
+
     @staticmethod
     def _transform_points(points: np.ndarray, transform: np.ndarray) -> np.ndarray:
         """Преобразует точки с использованием матрицы преобразования.